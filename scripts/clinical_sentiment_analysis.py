@@ -62,11 +62,33 @@ Version: 1.0.0
 Date: November 6, 2025
 """
 
+import asyncio
 import os
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+import platform
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Share model weights across processes through overmind's cache when it is installed;
+# set CLINICAL_SENTIMENT_SHARED=0 to disable. overmind must patch from_pretrained
+# before transformers is imported. A missing or broken overmind never stops the 
+# import: the models are then simply loaded per process.
+SHARED_WEIGHTS = os.getenv("CLINICAL_SENTIMENT_SHARED", "1") == "1"
+if SHARED_WEIGHTS:
+    try:
+        import overmind.api
+        overmind.api.monkey_patch_all()
+    except ImportError:
+        SHARED_WEIGHTS = False
+    except Exception as e:
+        print(f"Note: overmind weight sharing disabled - {str(e)[:50]}")
+        SHARED_WEIGHTS = False
+
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -82,6 +104,43 @@ try:
 except Exception:
     pass
 
+# On-disk cache for exported ONNX graphs and compiled TorchInductor kernels
+CACHE_DIR = Path.home() / ".cache" / "clinical_sentiment"
+# Padded sequence lengths used with torch.compile, so only a few shapes get compiled
+PAD_BUCKETS = (32, 64, 128, 256, 512)
+# Static shapes compiled per model: every length bucket with a single row 
+# (analyze_sentiment) or a full batch_size batch. Models of the same class share 
+# one forward() and thus one dynamo cache, so the recompile limit is raised to 
+# cover all three models; past it dynamo would silently fall back to eager mode.
+COMPILE_CACHE_LIMIT = 3 * 2 * len(PAD_BUCKETS)
+# torch.onnx.export relies on process-wide state: serialize first-run exports
+_ONNX_EXPORT_LOCK = threading.Lock()
+
+
+def _label_sign(label: str) -> int:
+    """
+    Map a classifier label to the sign of its sentiment contribution.
+
+    Args:
+        label (str): Label emitted by a sentiment model (e.g. 'NEGATIVE', 'LABEL_1')
+
+    Returns:
+        int: -1 for negative, +1 for positive, 0 for neutral/unknown labels
+    """
+    label = label.upper()
+    if 'NEGATIVE' in label or label == 'LABEL_0':
+        return -1
+    elif 'POSITIVE' in label or label == 'LABEL_1':
+        return 1
+    elif 'NEUTRAL' in label or label == 'LABEL_2':
+        return 0
+    # For 3-class models (negative, neutral, positive)
+    elif 'NEG' in label:
+        return -1
+    elif 'POS' in label:
+        return 1
+    return 0
+
 
 class ClinicalSentimentAnalyzer:
     """
@@ -92,15 +151,16 @@ class ClinicalSentimentAnalyzer:
     conserve memory and startup time.
     
     Attributes:
-        device (int): Device ID for computation (0+ for GPU, -1 for CPU)
+        device (int): Device ID for computation (0+ for GPU, -1 for CPU, None for MPS)
+        torch_device (torch.device): Device holding the models and input tensors
         models_loaded (bool): Flag indicating if models have been initialized
-        model1 (Pipeline): Mental Health BERT sentiment pipeline
-        model2 (Pipeline): RoBERTa healthcare sentiment pipeline
-        model3 (Pipeline): DistilBERT emotion sentiment pipeline
+        tokenizers (list): Tokenizers for Mental Health BERT, RoBERTa and DistilBERT
+        models (list): Matching AutoModelForSequenceClassification instances
+        cache_size (int): Capacity of the LRU cache of already scored texts
     
     Performance:
-        - CPU: ~5-25 sentences/second (depending on processor)
-        - GPU: ~50-300 sentences/second (depending on GPU)
+        - CPU: ~5-25 sentences/second (depending on processor), INT8 weights
+        - GPU: ~50-300 sentences/second (depending on GPU), FP16 weights
         - Memory: ~1.5-2GB RAM when models loaded
     
     Example:
@@ -109,46 +169,178 @@ class ClinicalSentimentAnalyzer:
         >>> # Single analysis
         >>> w1, w2, w3 = analyzer.analyze_sentiment("I feel better today")
         >>> 
-        >>> # Batch processing
+        >>> # Batch processing (one batched forward pass per model)
         >>> responses = ["I'm anxious", "Feeling great", "Kind of okay"]
-        >>> for response in responses:
-        >>>     weights = analyzer.analyze_sentiment(response)
-        >>>     print(weights)
+        >>> weights = analyzer.analyze_sentiments(responses)
+        >>> print(weights.shape)
+        (3, 3)
     
     Note:
         - Create one instance and reuse it for multiple analyses
         - Models download automatically on first run (~500MB)
         - GPU is used automatically if available
+        - Set CLINICAL_SENTIMENT_BACKEND=onnx to run on ONNX Runtime
+          (requires optimum[onnxruntime]; graphs cached in ~/.cache/clinical_sentiment)
+        - Set CLINICAL_SENTIMENT_COMPILE=1 to fuse kernels with torch.compile 
+          (slow first calls per input shape; kernels cached in the same folder;
+          keep batch_size constant, since batches of several texts are padded to it)
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 8192):
         """
         Initialize the three models for clinical sentiment analysis.
         Models are loaded on first use to save memory.
+        
+        Args:
+            cache_size (int): Maximum number of normalized texts whose weights 
+                are memoized (0 disables the cache)
         """
         # Device selection with env override for stability
         # Set CLINICAL_SENTIMENT_DEVICE=cpu to force CPU-only execution
+        # Set CLINICAL_SENTIMENT_BACKEND=onnx to run the models with ONNX Runtime
+        self.backend = os.getenv("CLINICAL_SENTIMENT_BACKEND", "torch").lower()
+        # Set CLINICAL_SENTIMENT_COMPILE=1 to compile the PyTorch models with torch.compile
+        self.compile_models = (
+            os.getenv("CLINICAL_SENTIMENT_COMPILE", "0") == "1"
+            and self.backend != "onnx"
+            and hasattr(torch, "compile")
+        )
         force_device = os.getenv("CLINICAL_SENTIMENT_DEVICE", "").lower()
         self.use_mps = hasattr(torch.backends, "mps") and torch.backends.mps.is_available()
         if force_device == "cpu":
             self.device = -1
-            self.device_map = None
+            self.torch_device = torch.device("cpu")
             self.use_mps = False
         elif torch.cuda.is_available():
             self.device = 0
-            self.device_map = None
+            self.torch_device = torch.device("cuda", 0)
         elif self.use_mps:
-            # Use Accelerate device map for MPS where supported
             self.device = None
-            self.device_map = "auto"
+            self.torch_device = torch.device("mps")
         else:
             self.device = -1
-            self.device_map = None
+            self.torch_device = torch.device("cpu")
+        if self.backend == "onnx" and self.device is None:
+            # ONNX Runtime has no MPS execution provider
+            self.device = -1
+            self.torch_device = torch.device("cpu")
+            self.use_mps = False
         self.models_loaded = False
-        self.model1 = None
-        self.model2 = None
-        self.model3 = None
+        self.tokenizers = [None, None, None]
+        self.models = [None, None, None]
+        # Per-model {class index: sign} lookups, built from config.id2label at load time
+        self._sign_tables: List[Optional[np.ndarray]] = [None, None, None]
+        # LRU cache {normalized text: (w1, w2, w3)}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        # Serializes model loading, inference and cache updates across threads
+        self._lock = threading.RLock()
+        
+    def _load_checkpoint(self, model_id: str):
+        """
+        Load the tokenizer and classification model of one checkpoint.
+        
+        Args:
+            model_id (str): Hugging Face Hub model identifier
+            
+        Returns:
+            tuple: (tokenizer, model) with the model in eval mode on self.torch_device
+        
+        Note:
+            On CPU the Linear layers are dynamically quantized to INT8, and on 
+            CUDA the weights are cast to FP16. MPS keeps FP32 weights. With the 
+            ONNX backend the model comes from _load_onnx_model() instead.
+            
+            When SHARED_WEIGHTS is set and overmind is installed, the weights 
+            are served from overmind's shared cache. Without overmind nothing 
+            is shared and every process loads its own copy. On the default CPU 
+            path quantize_dynamic also builds a private INT8 copy per process, 
+            so sharing only saves the FP32 checkpoint memory there.
+            
+            With compile_models the model is wrapped in torch.compile, 
+            specialized to the static shapes produced by _encode().
+        """
+        # Use slow tokenizer to avoid potential Rust tokenizers issues on some Python builds
+        tokenizer = AutoTokenizer.from_pretrained(model_id, use_fast=False)
+        if self.backend == "onnx":
+            return tokenizer, self._load_onnx_model(model_id)
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_id, torch_dtype=torch.float32
+        )
+        model = model.to(self.torch_device).eval()
+        if self.device == -1:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        elif self.device is not None:
+            model = model.half()
+        if self.compile_models:
+            model = torch.compile(model, mode="reduce-overhead", fullgraph=False, dynamic=False)
+        return tokenizer, model
+    
+    def _load_onnx_model(self, model_id: str):
+        """
+        Load one checkpoint as an optimized ONNX Runtime model.
+        
+        The first call exports the checkpoint to ONNX, applies the O3 graph 
+        optimizations (fused attention/GELU/LayerNorm) and, on CPU, dynamic INT8 
+        quantization. The result is cached under CACHE_DIR and reused by 
+        later calls.
+        
+        Args:
+            model_id (str): Hugging Face Hub model identifier
+            
+        Returns:
+            ORTModelForSequenceClassification: Model returning logits like the 
+                PyTorch classifier
+        
+        Raises:
+            ImportError: If optimum[onnxruntime] is not installed
+        """
+        from optimum.onnxruntime import (
+            ORTModelForSequenceClassification, ORTOptimizer, ORTQuantizer
+        )
+        from optimum.onnxruntime.configuration import (
+            AutoOptimizationConfig, AutoQuantizationConfig
+        )
+        
+        on_cpu = self.device == -1
+        provider = "CPUExecutionProvider" if on_cpu else "CUDAExecutionProvider"
+        cache_dir = CACHE_DIR / model_id.replace("/", "--")
+        optimized_dir = cache_dir / "optimized"
+        quantized_dir = cache_dir / "quantized"
+        if on_cpu:
+            model_dir, file_name = quantized_dir, "model_optimized_quantized.onnx"
+        else:
+            model_dir, file_name = optimized_dir, "model_optimized.onnx"
         
+        if not (model_dir / file_name).exists():
+            with _ONNX_EXPORT_LOCK:
+                # Another thread may have exported this checkpoint while we waited
+                if not (model_dir / file_name).exists():
+                    print(f"Exporting {model_id} to ONNX (first run only)...")
+                    exported = ORTModelForSequenceClassification.from_pretrained(
+                        model_id, export=True, provider=provider
+                    )
+                    optimizer = ORTOptimizer.from_pretrained(exported)
+                    optimizer.optimize(
+                        save_dir=optimized_dir,
+                        optimization_config=AutoOptimizationConfig.O3(),
+                    )
+                    if on_cpu:
+                        if platform.machine().lower() in ("arm64", "aarch64"):
+                            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+                        else:
+                            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                        quantizer = ORTQuantizer.from_pretrained(
+                            optimized_dir, file_name="model_optimized.onnx"
+                        )
+                        quantizer.quantize(save_dir=quantized_dir, quantization_config=qconfig)
+        
+        return ORTModelForSequenceClassification.from_pretrained(
+            model_dir, file_name=file_name, provider=provider
+        )
+    
     def _load_models(self):
         """
         Load all three sentiment analysis models.
@@ -174,8 +366,9 @@ class ClinicalSentimentAnalyzer:
         
         Side Effects:
             - Downloads models on first run (~500MB total)
+            - Loads the three checkpoints concurrently in worker threads
             - Sets self.models_loaded = True
-            - Initializes self.model1, self.model2, self.model3
+            - Initializes self.tokenizers, self.models and their sign tables
         
         Raises:
             Exception: Prints warnings but continues if individual models fail
@@ -185,109 +378,276 @@ class ClinicalSentimentAnalyzer:
             
         print("Loading clinical sentiment analysis models...")
         
-        # Helper to build device kwargs for pipeline
-        def _device_kwargs():
-            kwargs = {}
-            if self.device_map is not None:
-                kwargs["device_map"] = self.device_map
-            elif self.device is not None:
-                kwargs["device"] = self.device
-            return kwargs
-
+        # Persist compiled kernels so later processes skip most of the compilation
+        if self.compile_models:
+            os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(CACHE_DIR / "inductor"))
+            import torch._dynamo as _dynamo
+            dynamo_config = _dynamo.config
+            dynamo_config.cache_size_limit = max(
+                dynamo_config.cache_size_limit, COMPILE_CACHE_LIMIT
+            )
+        
+        # INT8 kernels for CPU quantization: FBGEMM on x86, QNNPACK on ARM
+        if self.device == -1 and self.backend != "onnx":
+            engines = torch.backends.quantized.supported_engines
+            is_arm = platform.machine().lower() in ("arm64", "aarch64")
+            if is_arm and "qnnpack" in engines:
+                torch.backends.quantized.engine = "qnnpack"
+            elif "fbgemm" in engines:
+                torch.backends.quantized.engine = "fbgemm"
+        
         # Model 1: Mental Health BERT
         # Specialized for mental health and psychological text
-        try:
-            # Use slow tokenizer to avoid potential Rust tokenizers issues on some Python builds
-            tok1 = AutoTokenizer.from_pretrained("mental/mental-bert-base-uncased", use_fast=False)
-            self.model1 = pipeline(
-                "sentiment-analysis",
-                model="mental/mental-bert-base-uncased",
-                tokenizer=tok1,
-                **_device_kwargs(),
-                truncation=True,
-                max_length=512
-            )
-            print("✓ Loaded mental-bert-base-uncased")
-        except Exception as e:
-            print(f"Note: Using fallback for Model 1 - {str(e)[:50]}")
-            tok_fallback = AutoTokenizer.from_pretrained(
-                "cardiffnlp/twitter-roberta-base-sentiment-latest", use_fast=False
-            )
-            self.model1 = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                tokenizer=tok_fallback,
-                **_device_kwargs(),
-                truncation=True,
-                max_length=512
-            )
+        # (its RoBERTa fallback is resolved after the pool, see below)
+        def _load1():
+            try:
+                loaded = self._load_checkpoint("mental/mental-bert-base-uncased")
+                print("✓ Loaded mental-bert-base-uncased")
+                return loaded
+            except Exception as e:
+                print(f"Note: Using fallback for Model 1 - {str(e)[:50]}")
+                return None, None
         
         # Model 2: RoBERTa fine-tuned for healthcare
         # Good for general clinical and healthcare contexts
-        try:
-            tok2 = AutoTokenizer.from_pretrained(
-                "cardiffnlp/twitter-roberta-base-sentiment-latest", use_fast=False
-            )
-            self.model2 = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                tokenizer=tok2,
-                **_device_kwargs(),
-                truncation=True,
-                max_length=512
-            )
-            print("✓ Loaded cardiffnlp RoBERTa sentiment model")
-        except Exception as e:
-            print(f"Warning loading Model 2: {e}")
+        def _load2():
+            try:
+                loaded = self._load_checkpoint("cardiffnlp/twitter-roberta-base-sentiment-latest")
+                print("✓ Loaded cardiffnlp RoBERTa sentiment model")
+                return loaded
+            except Exception as e:
+                print(f"Warning loading Model 2: {e}")
+                return None, None
             
         # Model 3: BERT base fine-tuned on SST-2 (TextAttack)
-        try:
-            model3_id = "textattack/bert-base-uncased-SST-2"
-            tok3 = AutoTokenizer.from_pretrained(model3_id, use_fast=False)
-            self.model3 = pipeline(
-                "sentiment-analysis",
-                model=model3_id,
-                tokenizer=tok3,
-                **_device_kwargs(),
-                truncation=True,
-                max_length=512
-            )
-            print("✓ Loaded TextAttack BERT SST-2 model")
-        except Exception as e:
-            print(f"Warning loading Model 3: {e}")
+        def _load3():
+            try:
+                loaded = self._load_checkpoint("textattack/bert-base-uncased-SST-2")
+                print("✓ Loaded TextAttack BERT SST-2 model")
+                return loaded
+            except Exception as e:
+                print(f"Warning loading Model 3: {e}")
+                return None, None
+        
+        # Checkpoint reads and weight allocation release the GIL, so the three 
+        # loads overlap instead of running back to back
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(load) for load in (_load1, _load2, _load3)]
+            for i, future in enumerate(futures):
+                self.tokenizers[i], self.models[i] = future.result()
+        
+        # Model 1 fallback is the Model 2 checkpoint: share the loaded pair rather 
+        # than loading (or exporting to ONNX) the same RoBERTa twice concurrently
+        if self.models[0] is None:
+            if self.models[1] is not None:
+                self.tokenizers[0], self.models[0] = self.tokenizers[1], self.models[1]
+            else:
+                self.tokenizers[0], self.models[0] = self._load_checkpoint(
+                    "cardiffnlp/twitter-roberta-base-sentiment-latest"
+                )
+        
+        # Resolve label signs once instead of parsing label strings per call
+        for i, model in enumerate(self.models):
+            if model is not None:
+                id2label = model.config.id2label
+                self._sign_tables[i] = np.array(
+                    [_label_sign(id2label[k]) for k in range(len(id2label))], dtype=float
+                )
         
         self.models_loaded = True
         print("All models loaded successfully!\n")
     
-    def _normalize_score(self, result) -> float:
+    def _normalize_scores(self, logits, i: int) -> np.ndarray:
         """
-        Convert model output to a score between -1 and 1.
+        Convert a batch of model outputs to scores between -1 and 1.
+        
+        The winning class of each row is signed through the model's precomputed 
+        sign table and scaled by its softmax probability, as the sentiment 
+        pipeline would report it.
         
         Args:
-            result: Output from sentiment pipeline
+            logits (torch.Tensor): Classification logits of shape (N, num_labels)
+            i (int): Index of the model that produced the logits
             
         Returns:
-            float: Normalized score between -1 (negative) and 1 (positive)
-        """
-        label = result[0]['label'].upper()
-        score = result[0]['score']
-        
-        # Handle different label formats
-        if 'NEGATIVE' in label or label == 'LABEL_0':
-            return -score
-        elif 'POSITIVE' in label or label == 'LABEL_1':
-            return score
-        elif 'NEUTRAL' in label or label == 'LABEL_2':
-            return 0.0
+            np.ndarray: Normalized scores between -1 (negative) and 1 (positive)
+        """
+        probs = torch.nn.functional.softmax(logits.float(), dim=-1)
+        scores, label_ids = probs.max(dim=-1)
+        return self._sign_tables[i][label_ids.cpu().numpy()] * scores.cpu().numpy()
+    
+    def _encode(self, tokenizer, texts: List[str], batch_size: int) -> Dict[str, torch.Tensor]:
+        """
+        Tokenize a batch of texts and move the tensors to the model device.
+        
+        Args:
+            tokenizer: Tokenizer of the target model
+            texts (List[str]): Texts in the batch
+            batch_size (int): Number of rows batches of several texts are padded 
+                to with compile_models
+            
+        Returns:
+            Dict[str, torch.Tensor]: Padded model inputs on self.torch_device
+        
+        Note:
+            With compile_models, sequences are padded up to the next length in 
+            PAD_BUCKETS instead of the batch maximum. A single text stays one 
+            row, and any larger batch is padded (with copies of the first text) 
+            to batch_size rows. Each model thus compiles two static shapes per 
+            length bucket, which COMPILE_CACHE_LIMIT accounts for, instead of 
+            one per partial chunk or server batch. Callers slice the logits back 
+            to len(texts).
+        """
+        if self.compile_models:
+            encoded = tokenizer(texts, truncation=True, max_length=512)
+            longest = max(len(ids) for ids in encoded["input_ids"])
+            bucket = next(b for b in PAD_BUCKETS if b >= longest)
+            encoded = tokenizer.pad(
+                encoded, padding="max_length", max_length=bucket, return_tensors="pt"
+            )
+            rows = 1 if len(texts) == 1 else max(batch_size, len(texts))
+            n_pad = rows - len(texts)
+            if n_pad > 0:
+                encoded = {
+                    k: torch.cat([v, v[:1].expand(n_pad, -1)]) for k, v in encoded.items()
+                }
         else:
-            # For 3-class models (negative, neutral, positive)
-            # Map to continuous scale
-            if 'NEG' in label:
-                return -score
-            elif 'POS' in label:
-                return score
-            else:
-                return 0.0
+            encoded = tokenizer(
+                texts, padding=True, truncation=True, max_length=512, return_tensors="pt"
+            )
+        return {k: v.to(self.torch_device) for k, v in encoded.items()}
+    
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """
+        Normalize text for cache lookup (whitespace collapsed).
+        
+        Case is preserved: the RoBERTa model is cased, so case variants of a 
+        text can score differently and must not share a cache entry.
+        """
+        return " ".join(text.split())
+    
+    def clear_cache(self):
+        """
+        Drop all memoized sentiment weights.
+        
+        Useful for long-running processes that score many unique texts.
+        """
+        with self._lock:
+            self._cache.clear()
+    
+    def _predict(self, texts: List[str], batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run all three models over texts in chunks of batch_size.
+        
+        Args:
+            texts (List[str]): Non-empty texts to score
+            batch_size (int): Number of texts fed to each model per forward pass
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (N, 3) weights and a boolean mask of 
+                rows for which every model succeeded
+        
+        Note:
+            A model that failed to load leaves its column at 0.0 without 
+            clearing the mask: that result is fixed for the lifetime of the 
+            analyzer, so the rows stay cacheable. Only inference errors, which 
+            may be transient, mark rows as failed.
+        """
+        weights = np.zeros((len(texts), 3), dtype=float)
+        ok = np.ones(len(texts), dtype=bool)
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            rows = slice(start, start + len(chunk))
+            # Encodings keyed by tokenizer so models sharing one reuse the tensors,
+            # and scored columns keyed by model so a shared model (Model 1's 
+            # RoBERTa fallback) runs once per chunk
+            encodings = {}
+            scored = {}
+            for j, (tokenizer, model) in enumerate(zip(self.tokenizers, self.models)):
+                if model is None:
+                    continue
+                if id(model) in scored:
+                    weights[rows, j] = weights[rows, scored[id(model)]]
+                    continue
+                try:
+                    key = tokenizer.name_or_path
+                    if key not in encodings:
+                        encodings[key] = self._encode(tokenizer, chunk, batch_size)
+                    with torch.inference_mode():
+                        logits = model(**encodings[key]).logits[:len(chunk)]
+                    weights[rows, j] = self._normalize_scores(logits, j)
+                    scored[id(model)] = j
+                except Exception as e:
+                    print(f"Warning: Model {j + 1} failed - {e}")
+                    ok[rows] = False
+        return weights, ok
+    
+    def analyze_sentiments(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Analyze sentiment of several clinical texts in batched forward passes.
+        
+        Texts are tokenized once per distinct tokenizer and chunk, moved to the 
+        device once, and fed to every model sharing that tokenizer, so inference 
+        is amortized over ``batch_size`` texts instead of paying one forward pass 
+        per text and model. Results are memoized in an LRU cache keyed by the 
+        whitespace-collapsed text, so repeated phrases skip inference.
+        
+        Args:
+            texts (List[str]): Clinical interview texts to analyze
+            batch_size (int): Number of texts fed to each model per forward pass
+        
+        Returns:
+            np.ndarray: Array of shape (N, 3) with one row of weights per text, 
+                columns ordered as in analyze_sentiment(). Empty or very short 
+                texts (< 3 characters) get a (0.0, 0.0, 0.0) row, and a model 
+                that failed to load or to run leaves its column at 0.0.
+        
+        Example:
+            >>> analyzer = ClinicalSentimentAnalyzer()
+            >>> weights = analyzer.analyze_sentiments(["I feel hopeless", "Much better"])
+            >>> weights.mean(axis=1)  # ensemble average per text
+        """
+        # One caller at a time: the LRU cache and the models (CUDA graphs with
+        # compile_models) are not safe for concurrent use
+        with self._lock:
+            # Load models on first use
+            if not self.models_loaded:
+                self._load_models()
+            
+            texts = list(texts)
+            weights = np.zeros((len(texts), 3), dtype=float)
+            
+            # Only texts with real content go through the cache and the models
+            pending: Dict[str, List[int]] = {}
+            for i, text in enumerate(texts):
+                if not text:
+                    continue
+                # The normalized key is shorter than 3 characters exactly when the 
+                # stripped text is, so it doubles as the short-text guard
+                key = self._cache_key(text)
+                if len(key) < 3:
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    weights[i] = cached
+                else:
+                    pending.setdefault(key, []).append(i)
+            if not pending:
+                return weights
+            
+            # Score each distinct uncached text once
+            keys = list(pending)
+            scored, ok = self._predict([texts[pending[k][0]] for k in keys], batch_size)
+            for key, row, row_ok in zip(keys, scored, ok):
+                weights[pending[key]] = row
+                if row_ok and self.cache_size > 0:
+                    self._cache[key] = tuple(float(w) for w in row)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            
+            return weights
     
     def analyze_sentiment(self, text: str) -> Tuple[float, float, float]:
         """
@@ -341,43 +701,16 @@ class ClinicalSentimentAnalyzer:
         Performance:
             - First call: Slower due to model loading
             - Subsequent calls: ~20-200ms depending on hardware
+            - Repeated texts: served from the LRU cache without inference
             - GPU acceleration: Automatic if available
         
         Note:
             For best performance with multiple texts, create the analyzer once 
-            and reuse it rather than creating new instances.
+            and reuse it rather than creating new instances, and prefer 
+            analyze_sentiments() to score many texts in one call.
         """
-        # Load models on first use
-        if not self.models_loaded:
-            self._load_models()
-        
-        # Handle empty or very short text
-        if not text or len(text.strip()) < 3:
-            return 0.0, 0.0, 0.0
-        
-        # Get predictions from all three models
-        try:
-            result1 = self.model1(text)
-            weight_1 = self._normalize_score(result1)
-        except Exception as e:
-            print(f"Warning: Model 1 failed - {e}")
-            weight_1 = 0.0
-        
-        try:
-            result2 = self.model2(text)
-            weight_2 = self._normalize_score(result2)
-        except Exception as e:
-            print(f"Warning: Model 2 failed - {e}")
-            weight_2 = 0.0
-            
-        try:
-            result3 = self.model3(text)
-            weight_3 = self._normalize_score(result3)
-        except Exception as e:
-            print(f"Warning: Model 3 failed - {e}")
-            weight_3 = 0.0
-        
-        return weight_1, weight_2, weight_3
+        w1, w2, w3 = self.analyze_sentiments([text])[0]
+        return float(w1), float(w2), float(w3)
     
     def get_average_sentiment(self, text: str) -> float:
         """
@@ -393,12 +726,192 @@ class ClinicalSentimentAnalyzer:
         return np.mean([w1, w2, w3])
 
 
+class ClinicalSentimentServer:
+    """
+    Asyncio front-end that coalesces concurrent requests into batched inference.
+    
+    Callers await submit() from any coroutine. A background task drains the 
+    request queue, waiting up to ``max_wait_ms`` for up to ``max_batch`` texts, 
+    and scores them with one analyze_sentiments() call on a single worker thread 
+    that owns the models. Each caller receives its own weights through a private 
+    response queue.
+    
+    Multiple clients (web handlers, notebook cells) should share one server 
+    instance, so their texts end up in the same batches and the models are 
+    loaded only once. A served analyzer may still be called directly (e.g. the 
+    module-level one behind get_clinical_sentiment_weights()): its calls are 
+    serialized with the server's batches by the analyzer's own lock.
+    
+    Attributes:
+        analyzer (ClinicalSentimentAnalyzer): Analyzer owning the models
+        max_batch (int): Maximum number of texts scored per forward pass
+        max_wait_ms (float): Time window for gathering texts into one batch
+    
+    Example:
+        >>> server = ClinicalSentimentServer(max_batch=32, max_wait_ms=10)
+        >>> responses = ["I'm anxious", "Feeling great", "Kind of okay"]
+        >>> 
+        >>> async def main():
+        ...     async with server:
+        ...         return await asyncio.gather(*(server.submit(t) for t in responses))
+        >>> 
+        >>> weights = asyncio.run(main())
+    """
+    
+    def __init__(self, analyzer: Optional[ClinicalSentimentAnalyzer] = None,
+                 max_batch: int = 32, max_wait_ms: float = 10.0):
+        """
+        Args:
+            analyzer (ClinicalSentimentAnalyzer): Analyzer to serve (a new one 
+                is created if omitted)
+            max_batch (int): Maximum number of texts scored per forward pass
+            max_wait_ms (float): Time window for gathering texts into one batch
+        """
+        self.analyzer = analyzer if analyzer is not None else ClinicalSentimentAnalyzer()
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    async def start(self):
+        """
+        Start the background server loop (called automatically by submit).
+        
+        A loop that ended without stop(), e.g. because its event loop was closed
+        by asyncio.run(), is replaced with a fresh queue and inference thread.
+        """
+        task = self._task
+        if task is not None and (task.done() or task.get_loop() is not asyncio.get_running_loop()):
+            self._executor.shutdown(wait=False)
+            self._task = self._queue = self._executor = None
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._task = asyncio.create_task(self.server_loop(self._queue))
+    
+    async def stop(self):
+        """
+        Cancel the server loop and release the inference thread.
+        
+        Requests that were still pending make their submit() call raise 
+        RuntimeError instead of waiting forever.
+        """
+        if self._task is None:
+            return
+        # Detach before awaiting: a submit() issued meanwhile starts a fresh 
+        # loop instead of queueing onto the one being torn down
+        task, queue, executor = self._task, self._queue, self._executor
+        self._task = self._queue = self._executor = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # Let a running forward pass finish without blocking the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, executor.shutdown)
+        self._fail_pending(queue, [])
+    
+    @staticmethod
+    def _fail_pending(q: asyncio.Queue, response_qs: List[asyncio.Queue]):
+        """Answer held and queued requests with an error when the server stops."""
+        error = RuntimeError("ClinicalSentimentServer was stopped")
+        while not q.empty():
+            response_qs.append(q.get_nowait()[1])
+        for response_q in response_qs:
+            if response_q.empty():
+                response_q.put_nowait(error)
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    async def submit(self, text: str) -> Tuple[float, float, float]:
+        """
+        Queue a text for analysis and wait for its sentiment weights.
+        
+        Args:
+            text (str): The clinical interview text to analyze
+            
+        Returns:
+            Tuple[float, float, float]: Same weights as analyze_sentiment()
+        """
+        await self.start()
+        response_q: asyncio.Queue = asyncio.Queue(maxsize=1)
+        await self._queue.put((text, response_q))
+        result = await response_q.get()
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    async def server_loop(self, q: asyncio.Queue):
+        """
+        Drain the request queue in batches and dispatch the results.
+        
+        Args:
+            q (asyncio.Queue): Queue of (text, response_q) requests
+        """
+        loop = asyncio.get_running_loop()
+        response_qs: List[asyncio.Queue] = []
+        try:
+            while True:
+                response_qs = []
+                await self._serve_batch(loop, q, response_qs)
+        except asyncio.CancelledError:
+            self._fail_pending(q, response_qs)
+            raise
+    
+    async def _serve_batch(self, loop, q: asyncio.Queue, response_qs: List[asyncio.Queue]):
+        """
+        Gather one batch of requests, score it and dispatch the results.
+        
+        Args:
+            loop: Running event loop
+            q (asyncio.Queue): Queue of (text, response_q) requests
+            response_qs (List[asyncio.Queue]): Filled with the response queues 
+                of the requests held by this batch
+        """
+        text, response_q = await q.get()
+        texts = [text]
+        response_qs.append(response_q)
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while len(texts) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                text, response_q = await asyncio.wait_for(q.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            texts.append(text)
+            response_qs.append(response_q)
+        
+        try:
+            weights = await loop.run_in_executor(
+                self._executor, self.analyzer.analyze_sentiments, texts, self.max_batch
+            )
+            results = [tuple(float(w) for w in row) for row in weights]
+        except Exception as e:
+            results = [e] * len(texts)
+        for response_q, result in zip(response_qs, results):
+            response_q.put_nowait(result)
+
+
 # Convenience function for quick usage
+# Shared analyzer so repeated calls load the models once per process
+_default_analyzer: Optional[ClinicalSentimentAnalyzer] = None
+
+
 def get_clinical_sentiment_weights(text: str) -> Tuple[float, float, float]:
     """
     Convenience function to get sentiment weights from clinical text.
-    Creates a new analyzer instance each time - for repeated use, 
-    create an analyzer instance and reuse it.
+    Reuses a module-level analyzer created on the first call, so the models 
+    are loaded only once per process. Set CLINICAL_SENTIMENT_SINGLETON=0 to 
+    create a fresh analyzer on every call instead (e.g. for tests).
     
     Args:
         text (str): The clinical interview text to analyze
@@ -411,8 +924,12 @@ def get_clinical_sentiment_weights(text: str) -> Tuple[float, float, float]:
         >>> print(weights)
         (-0.85, -0.72, -0.81)
     """
-    analyzer = ClinicalSentimentAnalyzer()
-    return analyzer.analyze_sentiment(text)
+    global _default_analyzer
+    if os.getenv("CLINICAL_SENTIMENT_SINGLETON", "1") == "0":
+        return ClinicalSentimentAnalyzer().analyze_sentiment(text)
+    if _default_analyzer is None:
+        _default_analyzer = ClinicalSentimentAnalyzer()
+    return _default_analyzer.analyze_sentiment(text)
 
 
 if __name__ == "__main__":
@@ -434,8 +951,9 @@ if __name__ == "__main__":
     
     print("\nAnalyzing sample clinical interview responses:\n")
     
-    for i, sentence in enumerate(test_sentences, 1):
-        w1, w2, w3 = analyzer.analyze_sentiment(sentence)
+    all_weights = analyzer.analyze_sentiments(test_sentences)
+    
+    for i, (sentence, (w1, w2, w3)) in enumerate(zip(test_sentences, all_weights), 1):
         avg = np.mean([w1, w2, w3])
         
         mood = "NEGATIVE" if avg < -0.3 else "POSITIVE" if avg > 0.3 else "NEUTRAL"
@@ -6,12 +6,27 @@ __date__ = "2025/05/23"
 __version__ = "1"
 __status__ = "Stable"
 
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import matplotlib as mpl   # <- needed for colour-map creation
+# headless Linux (SLURM, Docker): pick Agg before pyplot spins up a GUI backend
+if (sys.platform.startswith('linux') and not os.environ.get('DISPLAY')
+        and not os.environ.get('WAYLAND_DISPLAY')
+        and not os.environ.get('MPLBACKEND')):
+    mpl.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib import gridspec
+
 import numpy as np
 import nibabel as nib
+from nibabel.affines import apply_affine
 from nilearn import plotting, surface, datasets
-import matplotlib.pyplot as plt
-from matplotlib import gridspec
-import matplotlib as mpl   # <- needed for colour-map creation
+
+# file-only backends: plt.show() displays nothing with these
+NON_INTERACTIVE_BACKENDS = ('agg', 'pdf', 'svg', 'ps', 'pgf', 'cairo', 'template')
 
 # --------------------------------------------------------------------------
 # 1.  Helper – blue-white-red diverging cmap (white at 0)
@@ -24,11 +39,69 @@ def make_blue_white_red():
     )
 
 # --------------------------------------------------------------------------
-# 2.  Main plotting function  (NO self-call inside!)
+# 2.  Helper – atlas label under every fsaverage vertex (cached on disk)
+# --------------------------------------------------------------------------
+SURF_CACHE_DIR = Path.home() / '.cache' / 'brainnetome'
+
+def _cached_atlas_surface(atlas_path, fsavg, radius=3.0):
+    """Return (left, right) int32 atlas labels per pial vertex.
+
+    Like ``vol_to_surf`` (default 3 mm ball), each vertex samples the atlas
+    on a 1 mm grid within *radius* mm and takes the most frequent non-zero
+    label, so vertices sitting just outside the labelled grey matter still
+    get their parcel.  The mapping only depends on the atlas and the pial
+    coordinates of *fsavg* (hashed, so any mesh resolution gets its own
+    entry), so it is computed once and stored as
+    ``~/.cache/brainnetome/<hash>.npz``; replots reduce to ``lut[labels]``.
+    """
+    pials  = [surface.load_surf_mesh(p).coordinates
+              for p in (fsavg.pial_left, fsavg.pial_right)]
+    digest = hashlib.sha1(Path(atlas_path).read_bytes())
+    for coords in pials:
+        digest.update(np.ascontiguousarray(coords, dtype=np.float64).tobytes())
+    digest.update(f'{radius}'.encode())
+    cache  = SURF_CACHE_DIR / f'{digest.hexdigest()}.npz'
+    if cache.exists():
+        with np.load(cache) as npz:
+            return npz['left'], npz['right']
+
+    atlas_img  = nib.load(atlas_path)
+    atlas_data = np.asarray(atlas_img.dataobj, dtype=np.int32)
+    inv_affine = np.linalg.inv(atlas_img.affine)
+    r       = int(np.ceil(radius))
+    grid    = np.mgrid[-r:r + 1, -r:r + 1, -r:r + 1].reshape(3, -1).T
+    offsets = grid[np.linalg.norm(grid, axis=1) <= radius]      # (K, 3) mm
+    hemis = []
+    for coords in pials:
+        points = coords[:, None, :] + offsets[None, :, :]       # (N, K, 3)
+        ijk    = np.rint(apply_affine(inv_affine, points)).astype(int)
+        inside = np.all((ijk >= 0) & (ijk < atlas_data.shape), axis=-1)
+        samp   = np.zeros(inside.shape, dtype=np.int32)         # outside FOV -> 0
+        samp[inside] = atlas_data[tuple(ijk[inside].T)]
+        # most frequent non-zero label per vertex (0 if none was hit)
+        counts = np.zeros((len(coords), atlas_data.max() + 1), dtype=np.int32)
+        np.add.at(counts, (np.repeat(np.arange(len(coords)), samp.shape[1]),
+                           samp.ravel()), 1)
+        counts[:, 0] = 0
+        lab = counts.argmax(axis=1).astype(np.int32)
+        hemis.append(lab)
+
+    SURF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, left=hemis[0], right=hemis[1])
+    return hemis[0], hemis[1]
+
+# --------------------------------------------------------------------------
+# 3.  Main plotting function  (NO self-call inside!)
 # --------------------------------------------------------------------------
 def plot_brain_values(labels, values, atlas_path, lut_path,
                       deep_range=(211, 999),
-                      cmap=None, title='ICCI'):
+                      cmap=None, title='ICCI', out_path=None, dpi=100):
+    """Plot ROI values on fsaverage5 surfaces and sub-cortical slices.
+
+    If *out_path* is given the figure is saved there (at *dpi*) instead of
+    being shown.  With a non-interactive backend (headless/batch runs) and no
+    *out_path*, it is saved to ``brain_values.png`` in the working directory.
+    """
     if cmap is None:
         cmap = make_blue_white_red()          # default if none provided
 
@@ -36,7 +109,7 @@ def plot_brain_values(labels, values, atlas_path, lut_path,
     # load atlas + LUT
     # ---------------------------------------------------------------
     atlas_img  = nib.load(atlas_path)
-    atlas_data = atlas_img.get_fdata()
+    atlas_data = np.asarray(atlas_img.dataobj, dtype=np.int32)   # integer labels
     name2id    = {}
     with open(lut_path) as f:
         for ln in f:
@@ -47,16 +120,21 @@ def plot_brain_values(labels, values, atlas_path, lut_path,
     # ---------------------------------------------------------------
     # build value volume
     # ---------------------------------------------------------------
-    stat = np.zeros_like(atlas_data, dtype='float32')
+    # label-id -> value lookup table, applied with one gather
+    max_id = int(atlas_data.max())
+    lut    = np.zeros(max_id + 1, dtype=np.float32)
     for n, v in zip(labels, values):
         rid = name2id.get(n)
         if rid is None:
             print(f'⚠  “{n}” not found in LUT – skipped.')
             continue
-        stat[atlas_data == rid] = v
-    stat_img = nib.Nifti1Image(stat, atlas_img.affine, atlas_img.header)
+        if rid <= max_id:                     # ids absent from the volume
+            lut[rid] = v
+    stat = lut[atlas_data]
 
-    vmin, vmax = np.nanmin(values), np.nanmax(values)
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    vmin, vmax = finite.min(), finite.max()
 
     # ---------------------------------------------------------------
     # figure layout
@@ -71,8 +149,9 @@ def plot_brain_values(labels, values, atlas_path, lut_path,
     gs_top = gridspec.GridSpecFromSubplotSpec(2, 2, subplot_spec=gs[0],
                                               wspace=0.02, hspace=0.02)
     fsavg  = datasets.fetch_surf_fsaverage('fsaverage5')
-    tex_l  = surface.vol_to_surf(stat_img, fsavg.pial_left)
-    tex_r  = surface.vol_to_surf(stat_img, fsavg.pial_right)
+    atlas_surf_l, atlas_surf_r = _cached_atlas_surface(atlas_path, fsavg)
+    tex_l  = lut[atlas_surf_l]
+    tex_r  = lut[atlas_surf_r]
 
     views = [('left',  'lateral'),
              ('left',  'medial'),
@@ -111,7 +190,14 @@ def plot_brain_values(labels, values, atlas_path, lut_path,
     cb.set_label(title, rotation=90, labelpad=8, fontsize=11)
 
     plt.tight_layout(rect=[0.06, 0, 1, 0.95])
-    plt.show()
+    if out_path is None and plt.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+        out_path = 'brain_values.png'        # plt.show() would discard it
+    if out_path is not None:
+        fig.savefig(out_path, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+        print(f'✔ Figure saved → {out_path}')
+    else:
+        plt.show()
 
 cmap = make_blue_white_red()
 labels = ["A8m_L","A8m_R","A8dl_L",...]
@@ -43,26 +43,107 @@ f_list = {
 #    ⚠️  Choose a writable location (e.g. "~/roi_means.xlsx")
 output_path = "~/roi_means.xlsx"
 
+# 4) Optional atlas-defined ROIs ⇒ {column_name: atlas_label_id}
+#    Means for all atlas ROIs come from a single labelled pass per subject.
+#    Example (Brainnetome, ids from dependences/dataframes/brainnetome_labels.csv):
+# atlas_path = "dependences/atlas/BN_Atlas_246_2mm.nii.gz"
+# atlas_rois = {"A8m_L": 1, "A8m_R": 2}
+atlas_path = None
+atlas_rois = None
+
 ####################### DO NOT MODIFY BEYOND THIS POINT #######################
 
+# Re-imported so the core (os.cpu_count) still works when the example case is removed
+import os
 from pathlib import Path
 from typing import Mapping, Sequence, Union
 import nibabel as nib
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from scipy import ndimage, sparse
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: fall back to the SciPy sparse mat-vec
+    njit = None
 
 PathLike = Union[str, Path]
 
+# nibabel returns Fortran-ordered volumes; flattening masks and subject data in
+# that order makes ``ravel`` a view instead of a full-volume copy
+VOXEL_ORDER = "F"
+
 # -----------------------------------------------------------------------------
 # Core helper
 # -----------------------------------------------------------------------------
 
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _roi_means_kernel(flat, indptr, indices):
+        """Mean of ``flat`` over each CSR row (ROI), one thread per ROI."""
+        n_roi = indptr.size - 1
+        out = np.empty(n_roi, dtype=np.float64)
+        for r in prange(n_roi):
+            acc = 0.0
+            for k in range(indptr[r], indptr[r + 1]):
+                acc += flat[indices[k]]
+            n = indptr[r + 1] - indptr[r]
+            out[r] = acc / n if n > 0 else np.nan
+        return out
+else:
+    _roi_means_kernel = None
+
+
+def _process_subject(
+    subj: str,
+    img_path: PathLike,
+    roi_names: Sequence[str],
+    roi_matrix: sparse.csr_matrix,
+    roi_counts: np.ndarray,
+    atlas_args: tuple[list[str], np.ndarray, np.ndarray] | None,
+    mask_shape: tuple[int, ...],
+) -> dict[str, float]:
+    """Return ``{"SubjID": subj, roi: mean, ...}`` for one subject image.
+
+    All mask ROI means come from one pass over the voxels inside the ROIs: the
+    Numba kernel when available, otherwise the sparse mat-vec
+    ``roi_matrix @ flat``.  Atlas ROIs (``atlas_args = (names, ids, labels)``)
+    are averaged together with ``scipy.ndimage.mean``.
+    """
+    print(f"Working on subject {subj}…")
+    # Read through the (memory-mapped) data proxy at FP32: no FP64 copy, no cache
+    data = np.asarray(nib.load(str(img_path)).dataobj, dtype=np.float32)
+    if data.shape != mask_shape:
+        raise ValueError(
+            f"Image shape {data.shape} for subject {subj} does not match "
+            f"ROI mask shape {mask_shape}."
+        )
+    row = {"SubjID": subj}
+    if roi_names:
+        flat = data.ravel(order=VOXEL_ORDER)   # view, not a copy
+        if _roi_means_kernel is not None:
+            means = _roi_means_kernel(flat, roi_matrix.indptr, roi_matrix.indices)
+        else:
+            means = (roi_matrix @ flat) / roi_counts
+        row.update(zip(roi_names, means.tolist()))
+    if atlas_args is not None:
+        atlas_names, atlas_ids, atlas = atlas_args
+        # One C-level pass bins every voxel by its atlas label
+        means = ndimage.mean(data, labels=atlas, index=atlas_ids)
+        row.update(zip(atlas_names, np.atleast_1d(means).tolist()))
+    return row
+
+
 def create_mean_df(
     f_list: Mapping[str, PathLike],
     rois_path: Sequence[PathLike],
     output_path: PathLike | None = None,
     *,
     threshold: float = 0.0,
+    n_jobs: int | None = None,
+    atlas_path: PathLike | None = None,
+    atlas_rois: Mapping[str, int] | None = None,
 ) -> pd.DataFrame:
     """Return a DataFrame with one column per ROI containing masked means.
 
@@ -72,30 +153,73 @@ def create_mean_df(
         Mapping ``{SubjID: nifti_path}``.
     rois_path
         Iterable of ROI paths.  Each mask is binarised **once** with
-        ``data > threshold``.
+        ``data > threshold``.  May be empty when only atlas ROIs are used.
     output_path
         If provided, results are written to this Excel file. If the directory
         cannot be created (e.g. due to permissions), the file will be written
         to the current working directory instead, and a warning is printed.
     threshold
         Binarisation value (*default = 0*: include all positive voxels).
+    n_jobs
+        Worker processes for the subject loop (*default*: all cores). Cohorts
+        with fewer than 4 subjects, or ``n_jobs=1``, run serially.
+    atlas_path, atlas_rois
+        Optional label atlas and mapping ``{column_name: label_id}``.  These
+        ROIs skip the per-mask path: all of them are averaged in one labelled
+        pass per subject.  External masks keep using ``rois_path``.
     """
 
-    # 1) Pre‑load ROI masks once ➜ {name: bool_mask}
-    roi_masks = {
-        Path(p).stem: (nib.load(str(p)).get_fdata() > threshold)
-        for p in rois_path
-    }
-
-    # 2) Compute mean per ROI for each subject
-    records: list[dict[str, float]] = []
-    for subj, img_path in f_list.items():
-        print(f"Working on subject {subj}…")
-        data = nib.load(str(img_path)).get_fdata()
-        row = {"SubjID": subj}
-        for name, mask in roi_masks.items():
-            row[name] = float(data[mask].mean())
-        records.append(row)
+    # 1) Pre‑load ROI masks once ➜ {name: flat int32 voxel indices}
+    #    (4 B per ROI voxel instead of a 1 B/voxel whole-brain boolean mask)
+    roi_idx: dict[str, np.ndarray] = {}
+    mask_shape: tuple[int, ...] | None = None
+    for p in rois_path:
+        mask = np.asarray(nib.load(str(p)).dataobj) > threshold
+        if mask_shape is not None and mask.shape != mask_shape:
+            raise ValueError(
+                f"ROI mask {p} has shape {mask.shape}, expected {mask_shape}."
+            )
+        mask_shape = mask.shape
+        roi_idx[Path(p).stem] = np.flatnonzero(mask.ravel(order=VOXEL_ORDER)).astype(np.int32)
+
+    # Optional atlas ROIs ➜ one int32 label volume + the requested label ids
+    atlas_args = None
+    if atlas_path is not None and atlas_rois:
+        atlas = np.asarray(nib.load(str(atlas_path)).dataobj, dtype=np.int32)
+        if mask_shape is not None and atlas.shape != mask_shape:
+            raise ValueError(
+                f"Atlas {atlas_path} has shape {atlas.shape}, expected {mask_shape}."
+            )
+        mask_shape = atlas.shape
+        atlas_ids = np.array(list(atlas_rois.values()), dtype=np.int32)
+        atlas_args = (list(atlas_rois), atlas_ids, atlas)
+    if mask_shape is None:
+        raise ValueError("No ROIs given: provide rois_path and/or atlas_rois.")
+
+    # Stack the ROIs as rows of one sparse (R × V) indicator matrix
+    roi_names = list(roi_idx)
+    roi_counts = np.array([idx.size for idx in roi_idx.values()], dtype=np.int64)
+    indptr = np.concatenate(([0], np.cumsum(roi_counts))).astype(np.int32)
+    indices = np.concatenate([np.zeros(0, dtype=np.int32), *roi_idx.values()])
+    roi_matrix = sparse.csr_matrix(
+        (np.ones(indices.size, dtype=np.float64), indices, indptr),
+        shape=(len(roi_names), int(np.prod(mask_shape))),
+    )
+    roi_args = (roi_names, roi_matrix, roi_counts, atlas_args, mask_shape)
+
+    # 2) Compute mean per ROI for each subject (subjects are independent)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    records: list[dict[str, float]]
+    if n_jobs == 1 or len(f_list) < 4:
+        records = [
+            _process_subject(subj, img_path, *roi_args)
+            for subj, img_path in f_list.items()
+        ]
+    else:
+        records = Parallel(n_jobs=n_jobs, prefer="processes")(
+            delayed(_process_subject)(subj, img_path, *roi_args)
+            for subj, img_path in f_list.items()
+        )
 
     df = pd.DataFrame.from_records(records).set_index("SubjID").sort_index()
 
@@ -121,5 +245,7 @@ def create_mean_df(
 # Execute when running the file in Spyder
 # -----------------------------------------------------------------------------
 
-df_results = create_mean_df(f_list, rois_path, output_path)
+df_results = create_mean_df(
+    f_list, rois_path, output_path, atlas_path=atlas_path, atlas_rois=atlas_rois
+)
 print("\nPreview:\n", df_results.head())